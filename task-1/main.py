@@ -2,7 +2,18 @@ import cv2
 import numpy as np
 import os
 import argparse
-import glob
+import mmap
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    # Необязательная зависимость: пакетное декодирование на GPU (NVIDIA nvImageCodec)
+    from nvidia import nvimgcodec
+except ImportError:
+    nvimgcodec = None
 
 # Константы для параметров рисования
 DEFAULT_COLOR_RECTANGLE = (0, 0, 255)  # Красный цвет в BGR
@@ -14,29 +25,235 @@ DEFAULT_FONT_SCALE = 0.8
 DEFAULT_TEXT = "Sample Text"
 DEFAULT_OUTPUT_NAME = "output_image.jpg"
 
+# Размер очередей между стадиями конвейера (ограничивает число изображений в памяти)
+PIPELINE_QUEUE_SIZE = 4
+# Число изображений, декодируемых одним пакетом при обработке папки
+DECODE_BATCH_SIZE = 8
+
+# Чёрный холст стандартного размера, выделяется один раз
+_BLACK_CANVAS = np.zeros((400, 600, 3), dtype=np.uint8)
+
+# Блокировка вывода: при параллельной обработке папки сообщения потоков не перемешиваются
+_print_lock = threading.Lock()
+
+def log_message(message):
+    """
+    Печатает сообщение, не допуская перемешивания вывода из разных потоков.
+
+    Args:
+        message (str): Текст сообщения.
+
+    Returns:
+        None
+    """
+    with _print_lock:
+        print(message)
+
+def decode_image(data, flags=cv2.IMREAD_ANYCOLOR):
+    """
+    Декодирует изображение из уже загруженных в память байтов (без обращения к диску).
+
+    Args:
+        data (bytes | bytearray | memoryview | mmap.mmap): Содержимое файла изображения.
+        flags (int, optional): Флаги декодирования cv2.IMREAD_*. По умолчанию cv2.IMREAD_ANYCOLOR.
+
+    Returns:
+        numpy.ndarray | None: Декодированное изображение или None, если данные пусты или повреждены.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, flags)
+
+def mmap_imread(image_path, flags=cv2.IMREAD_ANYCOLOR):
+    """
+    Читает изображение через отображение файла в память и декодирует его cv2.imdecode.
+
+    В отличие от cv2.imread, файл не копируется в промежуточный буфер: декодер читает
+    страницы кэша файловой системы напрямую.
+
+    Args:
+        image_path (str): Путь к файлу изображения.
+        flags (int, optional): Флаги декодирования cv2.IMREAD_*. По умолчанию cv2.IMREAD_ANYCOLOR.
+
+    Returns:
+        numpy.ndarray | None: Декодированное изображение или None, если файл не удалось прочитать
+                              или декодировать (как у cv2.imread).
+    """
+    try:
+        with open(image_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Представление numpy на mmap живёт только внутри decode_image,
+            # поэтому к закрытию mmap на него уже нет ссылок
+            return decode_image(buffer, flags)
+    except (OSError, ValueError):
+        # ValueError: пустой файл нельзя отобразить в память
+        return None
+
 def load_image(image_path):
     """
-    Загружает изображение из файла или создаёт чёрный холст, если файл не найден.
+    Загружает изображение из файла или байтов, либо создаёт чёрный холст, если файл не найден.
 
     Args:
-        image_path (str | None): Путь к входному изображению. Если None или файл не существует,
-                                 функция возвращает чёрное изображение стандартного размера.
+        image_path (str | bytes | bytearray | memoryview | mmap.mmap | None): Путь к входному
+            изображению или его уже прочитанное содержимое (декодируется без обращения к диску). Если None,
+            файл не существует или данные не декодируются, функция возвращает чёрное изображение
+            стандартного размера.
 
     Returns:
-        numpy.ndarray: Изображение в формате BGR (dtype=np.uint8), shape = (H, W, 3).
+        numpy.ndarray: Изображение (dtype=np.uint8) в формате BGR, shape = (H, W, 3),
+                       или в оттенках серого, shape = (H, W), если исходный файл монохромный.
     """
-    if image_path and os.path.exists(image_path):
-        image = cv2.imread(image_path)
+    if isinstance(image_path, (bytes, bytearray, memoryview, mmap.mmap)):
+        image = decode_image(image_path, cv2.IMREAD_ANYCOLOR)
+        if image is not None:
+            return image
+    elif image_path and os.path.exists(image_path):
+        # IMREAD_ANYCOLOR не расширяет монохромные изображения до трёх каналов
+        image = mmap_imread(image_path, cv2.IMREAD_ANYCOLOR)
         if image is not None:
             return image
 
-    # Создаем черное изображение стандартного размера
-    return np.zeros((400, 600, 3), dtype=np.uint8)
+    # Чёрный холст стандартного размера: копия общего буфера, так как рисование изменяет изображение
+    return _BLACK_CANVAS.copy()
+
+@lru_cache(maxsize=None)
+def get_gpu_decoder():
+    """
+    Создаёт (один раз) декодер nvImageCodec, если пакет установлен и доступен GPU с CUDA.
+
+    Returns:
+        nvimgcodec.Decoder | None: Декодер или None, если GPU-декодирование недоступно.
+    """
+    if nvimgcodec is None:
+        return None
+    try:
+        return nvimgcodec.Decoder()
+    except Exception:
+        # Пакет установлен, но CUDA-устройство или драйвер недоступны
+        return None
+
+def load_images(image_paths, executor=None):
+    """
+    Загружает пакет изображений.
+
+    Если доступен nvImageCodec, весь пакет декодируется на GPU одним вызовом; файлы,
+    которые не удалось декодировать, загружаются через load_image. Если GPU-декодирование
+    пакета завершилось исключением, либо nvImageCodec недоступен, файлы читаются
+    через load_image (mmap_imread) параллельно в переданном пуле потоков.
+
+    Args:
+        image_paths (list[str]): Пути к изображениям.
+        executor (concurrent.futures.Executor | None): Пул для параллельного чтения на CPU.
+                                                       Если None — файлы читаются последовательно.
+
+    Returns:
+        list[numpy.ndarray]: Изображения в том же порядке, что и image_paths.
+    """
+    decoder = get_gpu_decoder()
+    if decoder is not None:
+        try:
+            decoded = decoder.read(image_paths)
+            # nvImageCodec возвращает RGB, остальной код работает с BGR
+            return [cv2.cvtColor(np.asarray(image.cpu()), cv2.COLOR_RGB2BGR) if image is not None
+                    else load_image(path)
+                    for path, image in zip(image_paths, decoded)]
+        except Exception as error:
+            # Ошибка одного файла не должна терять весь пакет: пакет читается на CPU
+            log_message(f"Предупреждение: GPU-декодирование не удалось ({error}), используется CPU")
+
+    if executor is None:
+        return [load_image(path) for path in image_paths]
+    return list(executor.map(load_image, image_paths))
+
+def ensure_color(image, colors):
+    """
+    Переводит монохромное изображение в BGR, только если на нём будут рисоваться цветные фигуры.
+
+    Args:
+        image (numpy.ndarray): Изображение в формате BGR или в оттенках серого.
+        colors (Iterable[tuple[int, int, int]]): Цвета фигур, которые будут нарисованы (BGR).
+
+    Returns:
+        numpy.ndarray: Исходное изображение, если преобразование не требуется, иначе его копия в BGR.
+    """
+    # Быстрый путь: цветное изображение или только серые цвета (OpenCV берёт первую компоненту)
+    if image.ndim == 3 or all(color[0] == color[1] == color[2] for color in colors):
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+# Проверки оставлены на чистом Python: с Numba (@njit) вызов медленнее из-за накладных
+# расходов диспетчера, а импорт numba заметно увеличивает время запуска скрипта
+def _valid_rect(height, width, x1, y1, x2, y2):
+    """
+    Проверяет, что прямоугольник (x1, y1)-(x2, y2) лежит внутри изображения height x width.
+
+    Returns:
+        bool: True, если углы внутри границ и x1 < x2, y1 < y2.
+    """
+    return (0 <= x1 < width and 0 <= y1 < height and
+            0 <= x2 < width and 0 <= y2 < height and
+            x1 < x2 and y1 < y2)
+
+def _valid_circle(height, width, x, y, radius):
+    """
+    Проверяет, что круг с центром (x, y) и радиусом radius лежит внутри изображения height x width.
+
+    Returns:
+        bool: True, если круг целиком внутри границ и radius > 0.
+    """
+    return (0 <= x - radius and x + radius < width and
+            0 <= y - radius and y + radius < height and
+            radius > 0)
+
+def _valid_text(height, width, x, y):
+    """
+    Проверяет, что начальная точка текста (x, y) лежит внутри изображения height x width.
+
+    Returns:
+        bool: True, если точка внутри границ.
+    """
+    return 0 <= x < width and 0 <= y < height
+
+def _circle_fits(height, width, center, radius, shift=0):
+    """
+    Проверяет круг, заданный в координатах с фиксированной точкой (shift дробных бит).
+
+    Returns:
+        bool: True, если круг целиком внутри изображения height x width.
+    """
+    # Сравнение выполняется в тех же единицах 1 / 2**shift пикселя, без округления:
+    # границы изображения переводятся в фиксированную точку сдвигом
+    return _valid_circle(height << shift, width << shift, center[0], center[1], radius)
+
+def validate_shapes(height, width, rect_params, circle_params, text_params):
+    """
+    Проверяет координаты всех фигур для изображения заданного размера.
+
+    Args:
+        height (int): Высота изображения.
+        width (int): Ширина изображения.
+        rect_params (tuple | list): Параметры прямоугольника в формате (start_point, end_point, color, thickness).
+        circle_params (tuple | list): Параметры круга в формате (center, radius, color, thickness[, line_type, shift]).
+        text_params (tuple | list): Параметры текста в формате (text, position, font, font_scale, color, thickness).
+
+    Returns:
+        tuple[bool, bool, bool]: Результаты проверки прямоугольника, круга и текста.
+    """
+    (x1, y1), (x2, y2) = rect_params[0], rect_params[1]
+    shift = circle_params[5] if len(circle_params) > 5 else 0
+    x, y = text_params[1]
+    return (_valid_rect(height, width, x1, y1, x2, y2),
+            _circle_fits(height, width, circle_params[0], circle_params[1], shift),
+            _valid_text(height, width, x, y))
 
 def validate_coordinates(image, coordinates, shape_type):
     """
     Проверяет корректность координат для заданного типа фигуры относительно размеров изображения.
 
+    Сохранена как часть публичного API модуля: внутри скрипта используются проверки
+    _valid_rect, _circle_fits и _valid_text напрямую.
+
     Args:
         image (numpy.ndarray): Изображение (используется для определения ширины и высоты).
         coordinates (tuple): Координаты фигуры.
@@ -51,20 +268,13 @@ def validate_coordinates(image, coordinates, shape_type):
     height, width = image.shape[:2]
 
     if shape_type == 'rectangle':
-        x1, y1, x2, y2 = coordinates
-        return (0 <= x1 < width and 0 <= y1 < height and
-                0 <= x2 < width and 0 <= y2 < height and
-                x1 < x2 and y1 < y2)
+        return _valid_rect(height, width, *coordinates)
 
     elif shape_type == 'circle':
-        x, y, radius = coordinates
-        return (0 <= x - radius and x + radius < width and
-                0 <= y - radius and y + radius < height and
-                radius > 0)
+        return _valid_circle(height, width, *coordinates)
 
     elif shape_type == 'text':
-        x, y = coordinates
-        return 0 <= x < width and 0 <= y < height
+        return _valid_text(height, width, *coordinates)
 
     return False
 
@@ -82,30 +292,38 @@ def draw_rectangle(image, start_point, end_point, color, thickness):
     Returns:
         numpy.ndarray: То же изображение с нанесённым прямоугольником.
     """
-    if validate_coordinates(image, (*start_point, *end_point), 'rectangle'):
+    height, width = image.shape[:2]
+    if _valid_rect(height, width, start_point[0], start_point[1], end_point[0], end_point[1]):
         cv2.rectangle(image, start_point, end_point, color, thickness)
     else:
-        print("Предупреждение: координаты прямоугольника выходят за границы изображения")
+        log_message("Предупреждение: координаты прямоугольника выходят за границы изображения")
     return image
 
-def draw_circle(image, center, radius, color, thickness):
+def draw_circle(image, center, radius, color, thickness, line_type=cv2.LINE_8, shift=0):
     """"
     Рисует круг на изображении с проверкой координат.
 
+    Для субпиксельной точности координаты задаются целыми числами с фиксированной точкой
+    вместо округления дробных значений: например, для точности 0.5 пикселя центр
+    и радиус умножаются на 2 и передаётся shift=1.
+
     Args:
         image (numpy.ndarray): Изображение, на котором выполняется рисование (изменяется in-place).
-        center (tuple[int, int]): Центр круга (x, y).
-        radius (int): Радиус круга в пикселях.
+        center (tuple[int, int]): Центр круга (x, y), в единицах 1 / 2**shift пикселя.
+        radius (int): Радиус круга, в единицах 1 / 2**shift пикселя.
         color (tuple[int, int, int]): Цвет круга в формате BGR.
         thickness (int): Толщина линии. Если thickness == -1 — круг заливается.
+        line_type (int, optional): Тип линии. По умолчанию cv2.LINE_8.
+        shift (int, optional): Число дробных бит в координатах центра и радиусе. По умолчанию 0.
 
     Returns:
         numpy.ndarray: То же изображение с нанесённым кругом.
     """
-    if validate_coordinates(image, (*center, radius), 'circle'):
-        cv2.circle(image, center, radius, color, thickness)
+    height, width = image.shape[:2]
+    if _circle_fits(height, width, center, radius, shift):
+        cv2.circle(image, center, radius, color, thickness, line_type, shift)
     else:
-        print("Предупреждение: координаты круга выходят за границы изображения")
+        log_message("Предупреждение: координаты круга выходят за границы изображения")
     return image
 
 def draw_text(image, text, position, font, font_scale, color, thickness, line_type=cv2.LINE_AA):
@@ -125,13 +343,86 @@ def draw_text(image, text, position, font, font_scale, color, thickness, line_ty
     Returns:
         numpy.ndarray: То же изображение с добавленным текстом.
     """
-    if validate_coordinates(image, position, 'text'):
+    height, width = image.shape[:2]
+    if _valid_text(height, width, position[0], position[1]):
         cv2.putText(image, text, position, font, font_scale, color, thickness, line_type)
     else:
-        print("Предупреждение: координаты текста выходят за границы изображения")
+        log_message("Предупреждение: координаты текста выходят за границы изображения")
+    return image
+
+def apply_all_shapes(image, rect_params, circle_params, text_params, checks=None):
+    """
+    Рисует прямоугольник, круг и текст за один вызов.
+
+    Координаты всех фигур проверяются один раз (validate_shapes), после чего функции
+    OpenCV вызываются подряд, без промежуточных обёрток draw_*.
+
+    Args:
+        image (numpy.ndarray): Изображение, на котором выполняется рисование (изменяется in-place).
+        rect_params (tuple): Параметры прямоугольника в формате (start_point, end_point, color, thickness).
+        circle_params (tuple): Параметры круга в формате (center, radius, color, thickness[, line_type, shift]).
+        text_params (tuple): Параметры текста в формате
+                             (text, position, font, font_scale, color, thickness[, line_type]).
+        checks (tuple[bool, bool, bool] | None, optional): Готовый результат validate_shapes для
+                                                           размеров image. Если None — проверка
+                                                           выполняется здесь.
+
+    Returns:
+        numpy.ndarray: То же изображение с нанесёнными фигурами и текстом.
+    """
+    if checks is None:
+        height, width = image.shape[:2]
+        checks = validate_shapes(height, width, rect_params, circle_params, text_params)
+    rect_ok, circle_ok, text_ok = checks
+
+    if rect_ok:
+        cv2.rectangle(image, *rect_params)
+    else:
+        log_message("Предупреждение: координаты прямоугольника выходят за границы изображения")
+
+    if circle_ok:
+        cv2.circle(image, *circle_params)
+    else:
+        log_message("Предупреждение: координаты круга выходят за границы изображения")
+
+    if text_ok:
+        # Как и в draw_text, по умолчанию текст сглаживается (cv2.LINE_AA)
+        line_type = text_params[6] if len(text_params) > 6 else cv2.LINE_AA
+        cv2.putText(image, *text_params[:6], line_type)
+    else:
+        log_message("Предупреждение: координаты текста выходят за границы изображения")
+
     return image
 
-def process_single_image(input_path, output_path, rect_params, circle_params, text_params):
+def save_image(input_path, output_path, image):
+    """
+    Сохраняет результат обработки и сообщает об этом в консоль.
+
+    Ошибки записи не пробрасываются, а выводятся в консоль: функция вызывается
+    и из фоновых потоков, где исключение иначе осталось бы незамеченным.
+
+    Args:
+        input_path (str | None): Путь к исходному изображению (для сообщения). None — чёрный холст.
+        output_path (str): Путь для сохранения результата (файл).
+        image (numpy.ndarray): Изображение для сохранения.
+
+    Returns:
+        bool: True, если изображение успешно сохранено.
+    """
+    try:
+        saved = cv2.imwrite(output_path, image)
+    except cv2.error as error:
+        log_message(f"Ошибка записи {output_path}: {error}")
+        return False
+    if not saved:
+        # Например, каталог не существует или путь занят каталогом
+        log_message(f"Ошибка записи {output_path}: не удалось сохранить файл")
+        return False
+    log_message(f"Обработано: {input_path or 'черное изображение'} -> {output_path}")
+    return True
+
+def process_single_image(input_path, output_path, rect_params, circle_params, text_params,
+                         writer_pool=None, pending_writes=None):
     """
     Обрабатывает одно изображение: загрузка, рисование фигур/текста и сохранение.
 
@@ -141,24 +432,149 @@ def process_single_image(input_path, output_path, rect_params, circle_params, te
         rect_params (tuple): Параметры прямоугольника в формате (start_point, end_point, color, thickness).
         circle_params (tuple): Параметры круга в формате (center, radius, color, thickness).
         text_params (tuple): Параметры текста в формате (text, position, font, font_scale, color, thickness).
+        writer_pool (concurrent.futures.Executor | None, optional): Пул для фоновой записи результата.
+                                                                    Если None — запись выполняется сразу.
+        pending_writes (list | None, optional): Список, в который добавляется Future фоновой записи
+                                                (результат — значение save_image), чтобы вызывающий
+                                                код мог проверить, удалась ли запись.
 
     Returns:
         numpy.ndarray: Получившееся изображение (BGR), которое также сохранено в output_path.
     """
     # Загрузка изображения
     image = load_image(input_path)
+    image = ensure_color(image, (rect_params[2], circle_params[2], text_params[4]))
 
     # Рисование фигур
-    image = draw_rectangle(image, *rect_params)
-    image = draw_circle(image, *circle_params)
-    image = draw_text(image, *text_params)
+    image = apply_all_shapes(image, rect_params, circle_params, text_params)
 
-    # Сохранение результата
-    cv2.imwrite(output_path, image)
-    print(f"Обработано: {input_path or 'черное изображение'} -> {output_path}")
+    # Сохранение результата (в фоне, если передан пул записи)
+    if writer_pool is None:
+        save_image(input_path, output_path, image)
+    else:
+        future = writer_pool.submit(save_image, input_path, output_path, image)
+        if pending_writes is not None:
+            pending_writes.append(future)
 
     return image
 
+def process_directory(image_paths, output_paths, rect_params, circle_params, text_params):
+    """
+    Обрабатывает набор изображений конвейером: чтение -> рисование -> запись.
+
+    Каждая стадия работает в своих потоках, стадии связаны ограниченными очередями.
+    Пока на одном изображении рисуются фигуры, следующее уже читается с диска,
+    а предыдущее записывается, при этом в памяти находится лишь несколько изображений.
+
+    Args:
+        image_paths (list[str]): Пути к входным изображениям.
+        output_paths (list[str]): Пути для сохранения результатов (в том же порядке).
+        rect_params (tuple): Параметры прямоугольника в формате (start_point, end_point, color, thickness).
+        circle_params (tuple): Параметры круга в формате (center, radius, color, thickness).
+        text_params (tuple): Параметры текста в формате (text, position, font, font_scale, color, thickness).
+
+    Ошибка на одном изображении не останавливает конвейер: она выводится в консоль,
+    а изображение засчитывается как необработанное.
+
+    Returns:
+        int: Число изображений, которые не удалось обработать или сохранить.
+    """
+    num_workers = os.cpu_count() or 1
+    colors = (rect_params[2], circle_params[2], text_params[4])
+    loaded = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    drawn = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    failed = []
+    # Параметры фигур одинаковы для всех изображений, поэтому проверка координат
+    # выполняется один раз для каждого размера изображения
+    checks_by_size = {}
+
+    def report_failure(action, path, error):
+        log_message(f"Ошибка {action} {path}: {error}")
+        failed.append(path)
+
+    def read_stage():
+        try:
+            # Изображения декодируются пакетами: на GPU — одним вызовом, на CPU — параллельно
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                for start in range(0, len(image_paths), DECODE_BATCH_SIZE):
+                    batch_inputs = image_paths[start:start + DECODE_BATCH_SIZE]
+                    batch_outputs = output_paths[start:start + DECODE_BATCH_SIZE]
+                    try:
+                        batch_images = load_images(batch_inputs, executor)
+                    except Exception as error:
+                        for input_path in batch_inputs:
+                            report_failure("чтения", input_path, error)
+                        continue
+                    for item in zip(batch_inputs, batch_outputs, batch_images):
+                        loaded.put(item)
+        finally:
+            # По одному маркеру завершения на каждый поток рисования
+            for _ in range(num_workers):
+                loaded.put(None)
+
+    def draw_stage():
+        try:
+            for input_path, output_path, image in iter(loaded.get, None):
+                # Исключение не должно завершать поток: иначе очередь loaded перестанет
+                # разбираться и стадия чтения навсегда заблокируется
+                try:
+                    image = ensure_color(image, colors)
+                    size = image.shape[:2]
+                    checks = checks_by_size.get(size)
+                    if checks is None:
+                        checks = validate_shapes(size[0], size[1], rect_params, circle_params, text_params)
+                        checks_by_size[size] = checks
+                    image = apply_all_shapes(image, rect_params, circle_params, text_params, checks)
+                except Exception as error:
+                    report_failure("обработки", input_path, error)
+                    continue
+                drawn.put((input_path, output_path, image))
+        finally:
+            drawn.put(None)
+
+    def write_stage():
+        finished = 0
+        while finished < num_workers:
+            item = drawn.get()
+            if item is None:
+                finished += 1
+                continue
+            input_path, output_path, image = item
+            try:
+                saved = save_image(input_path, output_path, image)
+            except Exception as error:
+                report_failure("записи", output_path, error)
+                continue
+            if not saved:
+                failed.append(output_path)
+
+    threads = [threading.Thread(target=read_stage), threading.Thread(target=write_stage)]
+    threads += [threading.Thread(target=draw_stage) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return len(failed)
+
+def configure_opencv(parallel_images):
+    """
+    Настраивает внутреннюю многопоточность и оптимизации OpenCV под режим работы.
+
+    Если изображения уже обрабатываются параллельно в нескольких потоках, каждая операция
+    OpenCV выполняется в одном потоке, чтобы избежать переподписки ядер. Иначе OpenCV
+    может использовать все ядра для обработки одного изображения.
+
+    Args:
+        parallel_images (bool): True, если изображения обрабатываются параллельно (режим папки).
+
+    Returns:
+        None
+    """
+    # Оптимизированные (SSE/AVX) реализации функций OpenCV
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(1 if parallel_images else (os.cpu_count() or 1))
+
 def main():
     """
     Парсинг аргументов командной строки и выбор режима работы:
@@ -173,7 +589,9 @@ def main():
         None
 
     Raises:
-        SystemExit: Может быть вызван argparse при некорректных аргументах.
+        SystemExit: Может быть вызван argparse при некорректных аргументах, а также с кодом 1,
+                    если часть изображений папки или результат одиночного режима не удалось
+                    обработать или сохранить.
     """
     # Парсинг аргументов командной строки
     parser = argparse.ArgumentParser(description='Рисование фигур на изображении')
@@ -182,6 +600,9 @@ def main():
     parser.add_argument('--text', type=str, default=DEFAULT_TEXT, help='Текст для отображения')
     args = parser.parse_args()
 
+    # Внутренние потоки OpenCV: в режиме папки параллелизм уже есть между изображениями
+    configure_opencv(parallel_images=bool(args.input) and os.path.isdir(args.input))
+
     # Параметры для рисования
     rect_params = [
         (50, 50),           # start_point
@@ -206,12 +627,18 @@ def main():
         DEFAULT_THICKNESS
     ]
 
+    # В одиночных режимах результат записывается в фоне, пока показывается окно
+    writer_pool = ThreadPoolExecutor(max_workers=2)
+    pending_writes = []
+    failed_count = 0
+
     # Определение режима работы (один файл или папка)
     if args.input:
         if os.path.isfile(args.input):
             # Обработка одного файла
             output_path = args.output or DEFAULT_OUTPUT_NAME
-            result_image = process_single_image(args.input, output_path, rect_params, circle_params, text_params)
+            result_image = process_single_image(args.input, output_path, rect_params, circle_params, text_params,
+                                                writer_pool=writer_pool, pending_writes=pending_writes)
 
             # Отображение результата
             cv2.imshow('Image with shapes and text', result_image)
@@ -223,21 +650,28 @@ def main():
             output_dir = args.output or "output"
             os.makedirs(output_dir, exist_ok=True)
 
-            # Поиск изображений
-            image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff']
-            image_paths = []
-            for extension in image_extensions:
-                image_paths.extend(glob.glob(os.path.join(args.input, extension)))
+            # Поиск изображений: один проход по папке, расширения сравниваются без учёта регистра.
+            # Пути сортируются, чтобы порядок (и нумерация выходных файлов) не зависел
+            # от порядка записей в файловой системе
+            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
+            with os.scandir(args.input) as entries:
+                image_paths = sorted(entry.path for entry in entries
+                                     if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_extensions)
+
+            output_paths = [os.path.join(output_dir, f"output_{i}_{os.path.basename(input_path)}")
+                            for i, input_path in enumerate(image_paths)]
 
-            # Обработка каждого изображения
-            for i, input_path in enumerate(image_paths):
-                output_path = os.path.join(output_dir, f"output_{i}_{os.path.basename(input_path)}")
-                process_single_image(input_path, output_path, rect_params, circle_params, text_params)
+            # Конвейерная обработка: чтение, рисование и запись перекрываются во времени.
+            # imread/imwrite и функции рисования OpenCV отпускают GIL,
+            # поэтому потоки работают одновременно
+            failed_count = process_directory(image_paths, output_paths,
+                                             rect_params, circle_params, text_params)
 
         else:
             print("Указанный путь не существует. Будет создано черное изображение.")
             output_path = args.output or DEFAULT_OUTPUT_NAME
-            result_image = process_single_image(None, output_path, rect_params, circle_params, text_params)
+            result_image = process_single_image(None, output_path, rect_params, circle_params, text_params,
+                                                writer_pool=writer_pool, pending_writes=pending_writes)
 
             # Отображение результата
             cv2.imshow('Image with shapes and text', result_image)
@@ -246,12 +680,21 @@ def main():
     else:
         # Обработка без входного файла (создание черного изображения)
         output_path = args.output or DEFAULT_OUTPUT_NAME
-        result_image = process_single_image(None, output_path, rect_params, circle_params, text_params)
+        result_image = process_single_image(None, output_path, rect_params, circle_params, text_params,
+                                            writer_pool=writer_pool, pending_writes=pending_writes)
 
         # Отображение результата
         cv2.imshow('Image with shapes and text', result_image)
         cv2.waitKey(0)
         cv2.destroyAllWindows()
 
+    # Дожидаемся завершения фоновых записей; неудачная запись тоже считается ошибкой
+    writer_pool.shutdown(wait=True)
+    failed_count += sum(1 for future in pending_writes if not future.result())
+
+    if failed_count:
+        print(f"Не удалось обработать изображений: {failed_count}")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
@@ -1,45 +1,185 @@
 import argparse
-import glob
+import mmap
 import os
-from typing import Optional
+import queue
+import sys
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
 
+try:
+    # Необязательная зависимость: пакетное декодирование на GPU (NVIDIA nvImageCodec)
+    from nvidia import nvimgcodec
+except ImportError:
+    nvimgcodec = None
+
 # Константы для параметров размытия
 DEFAULT_KERNEL_SIZE = 15
 DEFAULT_DIRECTION = 'horizontal'
 DEFAULT_OUTPUT_NAME = "motion_blur_output.jpg"
 
-def load_image(image_path: Optional[str]) -> np.ndarray:
+# Типы буферов с содержимым файла изображения, которые принимает decode_image
+ImageBuffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# Размер очередей между стадиями конвейера (ограничивает число изображений в памяти)
+PIPELINE_QUEUE_SIZE = 4
+# Число изображений, декодируемых одним пакетом при обработке папки
+DECODE_BATCH_SIZE = 8
+
+# Чёрный холст стандартного размера, выделяется один раз
+_BLACK_CANVAS = np.zeros((400, 600, 3), dtype=np.uint8)
+_BLACK_CANVAS.setflags(write=False)
+
+# Блокировка вывода: при параллельной обработке папки сообщения потоков не перемешиваются
+_print_lock = threading.Lock()
+
+def log_message(message: str) -> None:
+    """
+    Печатает сообщение, не допуская перемешивания вывода из разных потоков.
+
+    Args:
+        message (str): Текст сообщения.
+    """
+    with _print_lock:
+        print(message)
+
+def decode_image(data: ImageBuffer, flags: int = cv2.IMREAD_ANYCOLOR) -> Optional[np.ndarray]:
     """
-    Загружает изображение из файла или создаёт чёрный холст, если файл не найден.
+    Декодирует изображение из уже загруженных в память байтов (без обращения к диску).
 
     Args:
-        image_path (str | None): Путь к входному изображению. Если None или файл не существует,
-                                 функция возвращает чёрное изображение стандартного размера.
+        data (bytes | bytearray | memoryview | mmap.mmap): Содержимое файла изображения.
+        flags (int, optional): Флаги декодирования cv2.IMREAD_*. По умолчанию cv2.IMREAD_ANYCOLOR.
 
     Returns:
-        numpy.ndarray: Изображение в формате BGR (dtype=np.uint8), shape = (H, W, 3).
+        numpy.ndarray | None: Декодированное изображение или None, если данные пусты или повреждены.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, flags)
+
+def mmap_imread(image_path: str, flags: int = cv2.IMREAD_ANYCOLOR) -> Optional[np.ndarray]:
+    """
+    Читает изображение через отображение файла в память и декодирует его cv2.imdecode.
+
+    В отличие от cv2.imread, файл не копируется в промежуточный буфер: декодер читает
+    страницы кэша файловой системы напрямую.
+
+    Args:
+        image_path (str): Путь к файлу изображения.
+        flags (int, optional): Флаги декодирования cv2.IMREAD_*. По умолчанию cv2.IMREAD_ANYCOLOR.
+
+    Returns:
+        numpy.ndarray | None: Декодированное изображение или None, если файл не удалось прочитать
+                              или декодировать (как у cv2.imread).
+    """
+    try:
+        with open(image_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Представление numpy на mmap живёт только внутри decode_image,
+            # поэтому к закрытию mmap на него уже нет ссылок
+            return decode_image(buffer, flags)
+    except (OSError, ValueError):
+        # ValueError: пустой файл нельзя отобразить в память
+        return None
+
+def load_image(image_path: Union[str, ImageBuffer, None]) -> np.ndarray:
     """
-    if image_path and os.path.exists(image_path):
-        image = cv2.imread(image_path)
+    Загружает изображение из файла или байтов, либо создаёт чёрный холст, если файл не найден.
+
+    Args:
+        image_path (str | bytes | bytearray | memoryview | mmap.mmap | None): Путь к входному
+            изображению или его уже прочитанное содержимое (декодируется без обращения к диску). Если None,
+            файл не существует или данные не декодируются, функция возвращает чёрное изображение
+            стандартного размера.
+
+    Returns:
+        numpy.ndarray: Изображение (dtype=np.uint8) в формате BGR, shape = (H, W, 3),
+                       или в оттенках серого, shape = (H, W), если исходный файл монохромный.
+                       Чёрный холст возвращается как общий буфер только для чтения.
+    """
+    if isinstance(image_path, (bytes, bytearray, memoryview, mmap.mmap)):
+        image = decode_image(image_path, cv2.IMREAD_ANYCOLOR)
         if image is not None:
             return image
+    elif image_path and os.path.exists(image_path):
+        # IMREAD_ANYCOLOR не расширяет монохромные изображения до трёх каналов
+        image = mmap_imread(image_path, cv2.IMREAD_ANYCOLOR)
+        if image is not None:
+            return image
+
+    # Чёрный холст стандартного размера: размытие не изменяет входное изображение,
+    # поэтому общий буфер (только для чтения) возвращается без копирования
+    return _BLACK_CANVAS
+
+@lru_cache(maxsize=None)
+def get_gpu_decoder() -> Optional["nvimgcodec.Decoder"]:
+    """
+    Создаёт (один раз) декодер nvImageCodec, если пакет установлен и доступен GPU с CUDA.
+
+    Returns:
+        nvimgcodec.Decoder | None: Декодер или None, если GPU-декодирование недоступно.
+    """
+    if nvimgcodec is None:
+        return None
+    try:
+        return nvimgcodec.Decoder()
+    except Exception:
+        # Пакет установлен, но CUDA-устройство или драйвер недоступны
+        return None
+
+def load_images(image_paths: List[str], executor: Optional[Executor] = None) -> List[np.ndarray]:
+    """
+    Загружает пакет изображений.
 
-    # Создаем черное изображение стандартного размера
-    return np.zeros((400, 600, 3), dtype=np.uint8)
+    Если доступен nvImageCodec, весь пакет декодируется на GPU одним вызовом; файлы,
+    которые не удалось декодировать, загружаются через load_image. Если GPU-декодирование
+    пакета завершилось исключением, либо nvImageCodec недоступен, файлы читаются
+    через load_image (mmap_imread) параллельно в переданном пуле потоков.
 
-def create_motion_blur_kernel(kernel_size: int, direction: str = 'horizontal') -> np.ndarray:
+    Args:
+        image_paths (list[str]): Пути к изображениям.
+        executor (concurrent.futures.Executor | None): Пул для параллельного чтения на CPU.
+                                                       Если None — файлы читаются последовательно.
+
+    Returns:
+        list[numpy.ndarray]: Изображения в том же порядке, что и image_paths.
+    """
+    decoder = get_gpu_decoder()
+    if decoder is not None:
+        try:
+            decoded = decoder.read(image_paths)
+            # nvImageCodec возвращает RGB, остальной код работает с BGR
+            return [cv2.cvtColor(np.asarray(image.cpu()), cv2.COLOR_RGB2BGR) if image is not None
+                    else load_image(path)
+                    for path, image in zip(image_paths, decoded)]
+        except Exception as error:
+            # Ошибка одного файла не должна терять весь пакет: пакет читается на CPU
+            log_message(f"Предупреждение: GPU-декодирование не удалось ({error}), используется CPU")
+
+    if executor is None:
+        return [load_image(path) for path in image_paths]
+    return list(executor.map(load_image, image_paths))
+
+def create_motion_blur_kernel(kernel_size: int, direction: str = 'horizontal') -> Tuple[int, int]:
     """
     Создает ядро для размытия в движении в заданном направлении.
 
+    Ядро motion blur — это одна строка (или столбец) из единиц, нормализованная на
+    kernel_size, то есть одномерный усредняющий фильтр. Поэтому вместо плотной матрицы
+    kernel_size x kernel_size возвращается размер окна для cv2.boxFilter.
+
     Args:
         kernel_size (int): Размер ядра (должен быть нечетным).
         direction (str): Направление размытия ('horizontal' или 'vertical').
 
     Returns:
-        numpy.ndarray: Нормализованное ядро свертки для motion blur.
+        tuple[int, int]: Размер окна усреднения (ширина, высота).
 
     Raises:
         ValueError: Если kernel_size не является нечетным числом.
@@ -47,63 +187,231 @@ def create_motion_blur_kernel(kernel_size: int, direction: str = 'horizontal') -
     if kernel_size % 2 == 0:
         raise ValueError("kernel_size должен быть нечетным числом")
 
-    kernel = np.zeros((kernel_size, kernel_size))
-
     if direction == 'horizontal':
         # Горизонтальное размытие
-        kernel[int((kernel_size-1)/2), :] = np.ones(kernel_size)
+        return kernel_size, 1
     elif direction == 'vertical':
         # Вертикальное размытие
-        kernel[:, int((kernel_size-1)/2)] = np.ones(kernel_size)
+        return 1, kernel_size
     else:
         raise ValueError("Направление должно быть 'horizontal' или 'vertical'")
 
-    # Нормализуем ядро
-    kernel /= kernel_size
-    return kernel
-
-def apply_motion_blur(image: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+def apply_motion_blur(image: np.ndarray, kernel: Tuple[int, int],
+                      dst: Optional[np.ndarray] = None) -> np.ndarray:
     """
-    Применяет эффект motion blur к изображению с помощью свертки.
+    Применяет эффект motion blur к изображению с помощью усредняющего фильтра.
+
+    cv2.boxFilter считает скользящую сумму, поэтому стоимость на пиксель не зависит
+    от размера ядра (в отличие от свертки cv2.filter2D с плотным ядром). Если в OpenCV
+    доступен OpenCL, фильтр выполняется на GPU через T-API (cv2.UMat).
 
     Args:
         image (numpy.ndarray): Входное изображение.
-        kernel (numpy.ndarray): Ядро свертки для размытия.
+        kernel (tuple[int, int]): Размер окна усреднения (ширина, высота).
+        dst (numpy.ndarray | None): Буфер для результата. Используется, если совпадает
+                                    с image по форме и типу; иначе выделяется новый.
 
     Returns:
-        numpy.ndarray: Изображение с примененным эффектом motion blur.
+        numpy.ndarray: Изображение с примененным эффектом motion blur (dst, если он подошёл).
+    """
+    if cv2.ocl.useOpenCL():
+        # Данные копируются на устройство и обратно один раз на изображение;
+        # буферы на устройстве OpenCV переиспользует сам
+        return cv2.boxFilter(cv2.UMat(image), -1, kernel, normalize=True).get()
+
+    if dst is not None and (dst.shape != image.shape or dst.dtype != image.dtype):
+        dst = None
+    # Готовый объект фильтра (createBoxFilter) из Python доступен только в CUDA-сборках;
+    # boxFilter и так не хранит ядро, а стоимость на пиксель не зависит от его размера
+    return cv2.boxFilter(image, -1, kernel, dst=dst, normalize=True)
+
+def save_image(input_path: Optional[str], output_path: str, image: np.ndarray) -> bool:
     """
-    return cv2.filter2D(image, -1, kernel)
+    Сохраняет результат обработки и сообщает об этом в консоль.
+
+    Ошибки записи не пробрасываются, а выводятся в консоль: функция вызывается
+    и из фоновых потоков, где исключение иначе осталось бы незамеченным.
+
+    Args:
+        input_path (str | None): Путь к исходному изображению (для сообщения). None — чёрный холст.
+        output_path (str): Путь для сохранения результата.
+        image (numpy.ndarray): Изображение для сохранения.
+
+    Returns:
+        bool: True, если изображение успешно сохранено.
+    """
+    try:
+        saved = cv2.imwrite(output_path, image)
+    except cv2.error as error:
+        log_message(f"Ошибка записи {output_path}: {error}")
+        return False
+    if not saved:
+        # Например, каталог не существует или путь занят каталогом
+        log_message(f"Ошибка записи {output_path}: не удалось сохранить файл")
+        return False
+    log_message(f"Обработано: {input_path or 'черное изображение'} -> {output_path}")
+    return True
 
 def process_single_image(input_path: Optional[str], output_path: str,
-                         kernel_size: int, direction: str) -> np.ndarray:
+                         kernel: Tuple[int, int],
+                         image: Optional[np.ndarray] = None,
+                         writer_pool: Optional[Executor] = None,
+                         pending_writes: Optional[List[Future]] = None) -> np.ndarray:
     """
     Обрабатывает одно изображение: загрузка, применение motion blur и сохранение.
 
     Args:
         input_path (str | None): Путь к входному изображению. Если None — создаётся чёрный холст.
         output_path (str): Путь для сохранения результата.
-        kernel_size (int): Размер ядра для размытия.
-        direction (str): Направление размытия ('horizontal' или 'vertical').
+        kernel (tuple[int, int]): Ядро размытия, созданное create_motion_blur_kernel.
+        image (numpy.ndarray | None): Уже загруженное изображение input_path. Если передано,
+                                      файл повторно не читается и не декодируется.
+        writer_pool (concurrent.futures.Executor | None): Пул для фоновой записи результата.
+                                                          Если None — запись выполняется сразу.
+        pending_writes (list[Future] | None): Список, в который добавляется Future фоновой записи
+                                              (результат — значение save_image), чтобы вызывающий
+                                              код мог проверить, удалась ли запись.
 
     Returns:
         numpy.ndarray: Получившееся изображение с эффектом motion blur.
     """
-    # Загрузка изображения
-    image = load_image(input_path)
-
-    # Создание ядра размытия
-    kernel = create_motion_blur_kernel(kernel_size, direction)
+    # Загрузка изображения (если оно не было загружено заранее)
+    if image is None:
+        image = load_image(input_path)
 
     # Применение эффекта motion blur
     blurred_image = apply_motion_blur(image, kernel)
 
-    # Сохранение результата
-    cv2.imwrite(output_path, blurred_image)
-    print(f"Обработано: {input_path or 'черное изображение'} -> {output_path}")
+    # Сохранение результата (в фоне, если передан пул записи)
+    if writer_pool is None:
+        save_image(input_path, output_path, blurred_image)
+    else:
+        future = writer_pool.submit(save_image, input_path, output_path, blurred_image)
+        if pending_writes is not None:
+            pending_writes.append(future)
 
     return blurred_image
 
+def process_directory(image_paths: List[str], output_paths: List[str],
+                      kernel: Tuple[int, int]) -> int:
+    """
+    Обрабатывает набор изображений конвейером: чтение -> размытие и кодирование -> запись.
+
+    Каждая стадия работает в своих потоках, стадии связаны ограниченными очередями.
+    Пока одно изображение размывается, следующее уже читается с диска, а предыдущее
+    записывается, при этом в памяти одновременно находится лишь несколько изображений.
+    Кодирование (cv2.imencode) выполняется параллельно в потоках размытия, а единственный
+    поток записи только сохраняет готовые байты, так что в каждый момент идёт одна запись.
+
+    Args:
+        image_paths (list[str]): Пути к входным изображениям.
+        output_paths (list[str]): Пути для сохранения результатов (в том же порядке).
+        kernel (tuple[int, int]): Ядро размытия, созданное create_motion_blur_kernel.
+
+    Ошибка на одном изображении не останавливает конвейер: она выводится в консоль,
+    а изображение засчитывается как необработанное.
+
+    Returns:
+        int: Число изображений, которые не удалось обработать или сохранить.
+    """
+    num_workers = os.cpu_count() or 1
+    loaded = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    encoded = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    failed: List[str] = []
+
+    def report_failure(action: str, path: str, error: object) -> None:
+        log_message(f"Ошибка {action} {path}: {error}")
+        failed.append(path)
+
+    def read_stage() -> None:
+        try:
+            # Изображения декодируются пакетами: на GPU — одним вызовом, на CPU — параллельно
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                for start in range(0, len(image_paths), DECODE_BATCH_SIZE):
+                    batch_inputs = image_paths[start:start + DECODE_BATCH_SIZE]
+                    batch_outputs = output_paths[start:start + DECODE_BATCH_SIZE]
+                    try:
+                        batch_images = load_images(batch_inputs, executor)
+                    except Exception as error:
+                        for input_path in batch_inputs:
+                            report_failure("чтения", input_path, error)
+                        continue
+                    for item in zip(batch_inputs, batch_outputs, batch_images):
+                        loaded.put(item)
+        finally:
+            # По одному маркеру завершения на каждый поток размытия
+            for _ in range(num_workers):
+                loaded.put(None)
+
+    def blur_stage() -> None:
+        # Результат кодируется сразу в этом потоке, поэтому буфер размытия
+        # освобождается до следующего изображения и переиспользуется
+        blurred_image = None
+        try:
+            for input_path, output_path, image in iter(loaded.get, None):
+                # Исключение не должно завершать поток: иначе очередь loaded перестанет
+                # разбираться и стадия чтения навсегда заблокируется
+                try:
+                    blurred_image = apply_motion_blur(image, kernel, blurred_image)
+                except Exception as error:
+                    blurred_image = None
+                    report_failure("обработки", input_path, error)
+                    continue
+                # Формат определяется расширением выходного файла, как у cv2.imwrite
+                extension = os.path.splitext(output_path)[1]
+                try:
+                    success, buffer = cv2.imencode(extension, blurred_image)
+                except cv2.error as error:
+                    report_failure("кодирования", output_path, error)
+                    continue
+                if not success:
+                    report_failure("кодирования", output_path, "кодек вернул ошибку")
+                    continue
+                encoded.put((input_path, output_path, buffer))
+        finally:
+            encoded.put(None)
+
+    def write_stage() -> None:
+        finished = 0
+        while finished < num_workers:
+            item = encoded.get()
+            if item is None:
+                finished += 1
+                continue
+            input_path, output_path, buffer = item
+            try:
+                # Весь файл записывается одним вызовом write, без копирования в bytes
+                with open(output_path, 'wb') as file:
+                    file.write(buffer)
+            except Exception as error:
+                report_failure("записи", output_path, error)
+                continue
+            log_message(f"Обработано: {input_path} -> {output_path}")
+
+    threads = [threading.Thread(target=read_stage), threading.Thread(target=write_stage)]
+    threads += [threading.Thread(target=blur_stage) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return len(failed)
+
+def configure_opencv(parallel_images: bool) -> None:
+    """
+    Настраивает внутреннюю многопоточность и оптимизации OpenCV под режим работы.
+
+    Если изображения уже обрабатываются параллельно в нескольких потоках, каждая операция
+    OpenCV выполняется в одном потоке, чтобы избежать переподписки ядер. Иначе OpenCV
+    может использовать все ядра для обработки одного изображения.
+
+    Args:
+        parallel_images (bool): True, если изображения обрабатываются параллельно (режим папки).
+    """
+    # Оптимизированные (SSE/AVX) реализации функций OpenCV
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(1 if parallel_images else (os.cpu_count() or 1))
+
 def main():
     """
     Парсинг аргументов командной строки и выбор режима работы:
@@ -116,6 +424,10 @@ def main():
 
     Returns:
         None
+
+    Raises:
+        SystemExit: С кодом 1, если часть изображений папки или результат одиночного режима
+                    не удалось обработать или сохранить.
     """
     # Парсинг аргументов командной строки
     parser = argparse.ArgumentParser(description='Создание эффекта motion blur на изображениях')
@@ -129,21 +441,35 @@ def main():
 
     args = parser.parse_args()
 
+    # Внутренние потоки OpenCV: в режиме папки параллелизм уже есть между изображениями
+    configure_opencv(parallel_images=bool(args.input) and os.path.isdir(args.input))
+
     # Проверка корректности размера ядра
     if args.kernel_size % 2 == 0:
         print("Ошибка: kernel_size должен быть нечетным числом")
         return
 
+    # Ядро размытия одинаково для всех изображений, поэтому создается один раз
+    kernel = create_motion_blur_kernel(args.kernel_size, args.direction)
+
+    # В одиночных режимах результат записывается в фоне, пока показывается окно
+    writer_pool = ThreadPoolExecutor(max_workers=2)
+    pending_writes = []
+    failed_count = 0
+
     # Определение режима работы (один файл или папка)
     if args.input:
         if os.path.isfile(args.input):
             # Обработка одного файла
             output_path = args.output or DEFAULT_OUTPUT_NAME
-            result_image = process_single_image(args.input, output_path,
-                                                args.kernel_size, args.direction)
+            # Изображение декодируется один раз: для размытия и для показа оригинала
+            original_image = load_image(args.input)
+            result_image = process_single_image(args.input, output_path, kernel,
+                                                image=original_image, writer_pool=writer_pool,
+                                                pending_writes=pending_writes)
 
             # Отображение результата
-            cv2.imshow('Original', load_image(args.input))
+            cv2.imshow('Original', original_image)
             cv2.imshow('Motion Blur', result_image)
             cv2.waitKey(0)
             cv2.destroyAllWindows()
@@ -153,24 +479,26 @@ def main():
             output_dir = args.output or "motion_blur_output"
             os.makedirs(output_dir, exist_ok=True)
 
-            # Поиск изображений
-            image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff']
-            image_paths = []
-            for extension in image_extensions:
-                image_paths.extend(glob.glob(os.path.join(args.input, extension)))
+            # Поиск изображений: один проход по папке, расширения сравниваются без учёта регистра.
+            # Пути сортируются, чтобы порядок (и нумерация выходных файлов) не зависел
+            # от порядка записей в файловой системе
+            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
+            with os.scandir(args.input) as entries:
+                image_paths = sorted(entry.path for entry in entries
+                                     if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_extensions)
+
+            output_paths = [os.path.join(output_dir, f"motion_blur_{os.path.basename(input_path)}")
+                            for input_path in image_paths]
 
-            # Обработка каждого изображения
-            for input_path in image_paths:
-                output_filename = f"motion_blur_{os.path.basename(input_path)}"
-                output_path = os.path.join(output_dir, output_filename)
-                process_single_image(input_path, output_path,
-                                     args.kernel_size, args.direction)
+            # Конвейерная обработка: чтение, размытие и запись перекрываются во времени.
+            # imread/imwrite и boxFilter отпускают GIL, поэтому потоки работают одновременно
+            failed_count = process_directory(image_paths, output_paths, kernel)
 
         else:
             print("Указанный путь не существует. Будет создано черное изображение.")
             output_path = args.output or DEFAULT_OUTPUT_NAME
-            result_image = process_single_image(None, output_path,
-                                                args.kernel_size, args.direction)
+            result_image = process_single_image(None, output_path, kernel, writer_pool=writer_pool,
+                                                pending_writes=pending_writes)
 
             # Отображение результата
             cv2.imshow('Motion Blur on Black Canvas', result_image)
@@ -179,13 +507,21 @@ def main():
     else:
         # Обработка без входного файла (создание черного изображения)
         output_path = args.output or DEFAULT_OUTPUT_NAME
-        result_image = process_single_image(None, output_path,
-                                            args.kernel_size, args.direction)
+        result_image = process_single_image(None, output_path, kernel, writer_pool=writer_pool,
+                                            pending_writes=pending_writes)
 
         # Отображение результата
         cv2.imshow('Motion Blur on Black Canvas', result_image)
         cv2.waitKey(0)
         cv2.destroyAllWindows()
 
+    # Дожидаемся завершения фоновых записей; неудачная запись тоже считается ошибкой
+    writer_pool.shutdown(wait=True)
+    failed_count += sum(1 for future in pending_writes if not future.result())
+
+    if failed_count:
+        print(f"Не удалось обработать изображений: {failed_count}")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()